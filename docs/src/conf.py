@@ -68,6 +68,8 @@ extlinks = {'Peewee': ('https://docs.peewee-orm.com/en/latest/%s', '%s'),
             'sofa': ('https://www.sofa-framework.org/%s', '%s'),
             'SP3': ('https://sofapython3.readthedocs.io/en/latest/%s', '%s'),
             'Numpy': ('https://numpy.org/%s', '%s'),
+            'orjson': ('https://github.com/ijl/orjson%s', '%s'),
+            'Blosc': ('https://www.blosc.org/%s', '%s'),
             'PyPi': ('https://pypi.org/project/SimulationSimpleDatabase/%s', '%s'),
             }
 
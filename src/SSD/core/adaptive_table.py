@@ -1,8 +1,7 @@
-from typing import Dict, Type, Any, Union, List, Optional
+from typing import Dict, Type, Any, Union, List, Optional, Tuple, Callable
 from peewee import IntegerField, FloatField, TextField, BooleanField, BlobField, DateTimeField, ForeignKeyField, Field
-from peewee import chunked
+from peewee import SqliteDatabase, __exception_wrapper__
 from playhouse.signals import Model, pre_save, post_save
-from playhouse.migrate import migrate, SqliteMigrator, SqliteDatabase
 from numpy import ndarray
 from datetime import datetime
 
@@ -11,6 +10,7 @@ from SSD.core.numpy_field import NumpyField
 
 class AdaptiveTable(Model):
     role: str = 'Adaptive'
+    compress_arrays: Union[bool, str] = False
     table_type: Dict[Type, Field] = {int: IntegerField,
                                      float: FloatField,
                                      str: TextField,
@@ -35,7 +35,154 @@ class AdaptiveTable(Model):
     @classmethod
     def fields(cls, only_names: bool = True) -> Union[List[str], Dict[str, Field]]:
 
-        return list(cls._meta.fields.keys()) if only_names else cls._meta.fields
+        # The list of names is cached per Table class until the schema changes
+        if not only_names:
+            return cls._meta.fields
+        if cls.__dict__.get('_names_cache') is None:
+            cls._names_cache = list(cls._meta.fields.keys())
+        return cls._names_cache
+
+    @classmethod
+    def get_fields(cls,
+                   fields_names: List[str]) -> List[Field]:
+
+        # Resolved Fields are cached per Table class since the same names are used across consecutive calls
+        if '_fields_cache' not in cls.__dict__:
+            cls._fields_cache = {}
+        key = tuple(fields_names)
+        if key not in cls._fields_cache:
+            cls._fields_cache[key] = [getattr(cls, field) for field in fields_names]
+        return cls._fields_cache[key]
+
+    @classmethod
+    def get_insert_query(cls,
+                         fields_names: List[str]) -> Tuple[List[Callable], List[Tuple[Callable, Any]], str]:
+
+        # The INSERT query of a list of fields is cached per Table class, along with the values converters and the
+        # missing fields default values (constant ones being converted once)
+        if '_insert_cache' not in cls.__dict__:
+            cls._insert_cache = {}
+        key = tuple(fields_names)
+        if key not in cls._insert_cache:
+            fields = cls.get_fields(fields_names)
+            converters = [field.db_value for field in fields]
+            defaults = [(field, value) for field, value in cls._meta.defaults.items() if field.name not in fields_names]
+            columns = [f'"{field.column_name}"' for field in fields + [field for field, _ in defaults]]
+            sql = f'INSERT INTO "{cls._meta.table_name}" ({", ".join(columns)}) ' \
+                  f'VALUES ({", ".join(["?"] * len(columns))})'
+            # A line without any value to set is inserted with the default values of the Table
+            if len(columns) == 0:
+                sql = f'INSERT INTO "{cls._meta.table_name}" DEFAULT VALUES'
+            defaults = [(field.db_value, value) if callable(value) else (None, field.db_value(value))
+                        for field, value in defaults]
+            cls._insert_cache[key] = (converters, defaults, sql)
+        return cls._insert_cache[key]
+
+    @classmethod
+    def insert_line(cls,
+                    fields_names: List[str],
+                    fields_values: List[Any]) -> int:
+
+        # The cached INSERT query is executed with the line values converted without the ORM
+        converters, defaults, sql = cls.get_insert_query(fields_names)
+        values = [db_value(value) for db_value, value in zip(converters, fields_values)]
+        values += [value if db_value is None else db_value(value()) for db_value, value in defaults]
+        return cls.database().execute_sql(sql, values).lastrowid
+
+    @classmethod
+    def update_line(cls,
+                    fields_names: List[str],
+                    fields_values: List[Any],
+                    line_id: int) -> None:
+
+        # The UPDATE query of a list of fields is cached per Table class, along with the values converters
+        if '_update_cache' not in cls.__dict__:
+            cls._update_cache = {}
+        key = tuple(fields_names)
+        if key not in cls._update_cache:
+            fields = cls.get_fields(fields_names)
+            columns = [f'"{field.column_name}" = ?' for field in fields]
+            sql = f'UPDATE "{cls._meta.table_name}" SET {", ".join(columns)} ' \
+                  f'WHERE "{cls._meta.primary_key.column_name}" = ?'
+            cls._update_cache[key] = ([field.db_value for field in fields], sql)
+        converters, sql = cls._update_cache[key]
+        cls.database().execute_sql(sql, [db_value(value) for db_value, value in zip(converters, fields_values)] +
+                                   [line_id])
+
+    @classmethod
+    def select_line(cls,
+                    fields: List[Field],
+                    line_id: int) -> Dict[str, Any]:
+
+        # The SELECT query of a list of fields is cached per Table class, along with the values converters
+        if '_select_cache' not in cls.__dict__:
+            cls._select_cache = {}
+        fields = fields if len(fields) > 0 else cls._meta.sorted_fields
+        key = tuple(field.name for field in fields)
+        if key not in cls._select_cache:
+            # Columns are qualified with the Table name so that an unknown column raises an error instead of being
+            # read as a string literal by SQLite
+            columns = [f'"{cls._meta.table_name}"."{field.column_name}"' for field in fields]
+            sql = f'SELECT {", ".join(columns)} FROM "{cls._meta.table_name}" ' \
+                  f'WHERE "{cls._meta.primary_key.column_name}" = ?'
+            cls._select_cache[key] = ([field.python_value for field in fields], sql)
+        converters, sql = cls._select_cache[key]
+        line = cls.database().execute_sql(sql, (line_id,)).fetchone()
+        if line is None:
+            raise IndexError(f"No line with index {line_id} in table {cls._meta.name}.")
+        return {name: python_value(value) for name, python_value, value in zip(key, converters, line)}
+
+    @classmethod
+    def clear_cache(cls) -> None:
+
+        cls.__dict__.get('_fields_cache', {}).clear()
+        cls.__dict__.get('_insert_cache', {}).clear()
+        cls.__dict__.get('_update_cache', {}).clear()
+        cls.__dict__.get('_select_cache', {}).clear()
+        cls.__dict__.get('_description_cache', {}).clear()
+        cls._names_cache = None
+
+    @classmethod
+    def has_receivers(cls) -> bool:
+
+        # Check if a pre_save or post_save handler is connected for the lines of this Table; playhouse has no public
+        # API to list the receivers of a signal, so its private '_receiver_list' is read on purpose
+        return any(sender is None or issubclass(cls, sender)
+                   for signal in (pre_save, post_save) for _, _, sender in signal._receiver_list)
+
+    @classmethod
+    def insert_batch(cls,
+                     fields_names: List[str],
+                     fields_values: List[Any]) -> List[int]:
+
+        # The default values of the missing fields are inserted as well
+        converters, defaults, sql = cls.get_insert_query(fields_names)
+
+        # The query is executed with the sqlite3 cursor, values being converted column by column without the ORM
+        columns_values = [list(map(db_value, values)) for db_value, values in zip(converters, fields_values)]
+        nb_lines = min([len(values) for values in columns_values], default=0)
+        if nb_lines == 0:
+            return []
+        for db_value, value in defaults:
+            columns_values.append([value] * nb_lines if db_value is None
+                                  else [db_value(value()) for _ in range(nb_lines)])
+        # sqlite3 errors are converted to peewee errors as in Database.execute_sql
+        with cls.database().atomic(), __exception_wrapper__:
+            cursor = cls.database().cursor()
+            # Lines are assembled from the columns while being inserted
+            cursor.executemany(sql, zip(*columns_values))
+            # Lines inserted in a single transaction get consecutive ids ending with the last inserted one
+            last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+        return list(range(last_id - nb_lines + 1, last_id + 1))
+
+    @classmethod
+    def migrator(cls):
+
+        # The migrator is created once per Table class, for the Database the Table is bound to
+        from playhouse.migrate import SqliteMigrator
+        if cls.__dict__.get('_migrator') is None or cls._migrator.database is not cls.database():
+            cls._migrator = SqliteMigrator(cls.database())
+        return cls._migrator
 
     @classmethod
     def connect(cls, database: SqliteDatabase) -> None:
@@ -43,61 +190,100 @@ class AdaptiveTable(Model):
         cls.bind(database)
         cls.database().create_tables([cls])
 
+    @classmethod
+    def mutate(cls,
+               operations: List[Tuple]) -> None:
+
+        # Operations are ('add', field_name, data_type, default_value), ('add_fk', model, field_name),
+        # ('rename_table', old_table_name, new_table_name), ('rename', old_field_name, new_field_name) and
+        # ('drop', field_name)
+        from playhouse.migrate import migrate
+        migrator = cls.migrator()
+        migrations, updates = [], []
+        for operation, *args in operations:
+
+            if operation == 'add':
+                field_name, data_type, default_value = args
+                atts = {'null': True}
+                if default_value != '_null_':
+                    # bool being a subclass of int, bool default values are only accepted by bool fields
+                    if not isinstance(default_value, data_type) or \
+                            (isinstance(default_value, bool) and data_type is not bool):
+                        raise TypeError(
+                            f"The default value type for field {field_name} of table {cls._meta.name} must be "
+                            f"{data_type}, not {type(default_value)}.")
+                    atts['default'] = default_value
+                elif data_type == datetime:
+                    atts['default'] = datetime.now
+                field = cls.table_type.get(data_type, BlobField)(**atts)
+                migrations.append(migrator.add_column(cls._meta.name, field_name, field))
+                updates.append(lambda name=field_name, f=field: cls._meta.add_field(name, f))
+
+            elif operation == 'add_fk':
+                model, field_name = args
+                field = ForeignKeyField(model=model, backref=field_name, null=True, field=model._meta.primary_key)
+                migrations.append(migrator.add_column(cls._meta.name, field_name, field))
+                updates.append(lambda name=field_name, f=field: cls._meta.add_field(name, f))
+
+            elif operation == 'rename_table':
+                migrations.append(migrator.rename_table(*args))
+
+            elif operation == 'rename':
+                old_field_name, new_field_name = args
+                migrations.append(migrator.rename_column(cls._meta.name, old_field_name, new_field_name))
+                updates.append(lambda old=old_field_name, new=new_field_name:
+                               cls._meta.add_field(new, getattr(cls, old)))
+                updates.append(lambda old=old_field_name: cls._meta.remove_field(old))
+
+            elif operation == 'drop':
+                field_name, = args
+                migrations.append(migrator.drop_column(cls._meta.name, field_name))
+                updates.append(lambda name=field_name: cls._meta.remove_field(name))
+
+            else:
+                raise ValueError(f"Unknown schema operation '{operation}' for table {cls._meta.name}.")
+
+        # All the operations are run in a single transaction, the model being updated once they succeeded
+        with cls.database().atomic():
+            migrate(*migrations)
+        for update in updates:
+            update()
+        cls.clear_cache()
+
     @classmethod
     def extend(cls,
                field_name: str,
                data_type: Type,
                default_value: Any) -> None:
 
-        migrator = SqliteMigrator(cls.database())
-        atts = {'null': True}
-        if default_value != '_null_':
-            if type(default_value) != data_type:
-                raise TypeError(
-                    f"The default value type for field {field_name} of table {cls._meta.name} must be {data_type},"
-                    f" not {type(default_value)}.")
-            atts['default'] = default_value
-        elif data_type == datetime:
-            atts['default'] = datetime.now
-        field = cls.table_type.get(data_type, BlobField)(**atts)
-        migrate(migrator.add_column(cls._meta.name, field_name, field))
-        cls._meta.add_field(field_name, field)
+        cls.mutate([('add', field_name, data_type, default_value)])
 
     @classmethod
     def extend_fk(cls,
                   model: Model,
                   field_name: str) -> None:
 
-        migrator = SqliteMigrator(cls.database())
-        field = ForeignKeyField(model=model, backref=field_name, null=True, field=model._meta.primary_key)
-        migrate(migrator.add_column(cls._meta.name, field_name, field))
-        cls._meta.add_field(field_name, field)
+        cls.mutate([('add_fk', model, field_name)])
 
     @classmethod
     def rename_table(cls,
                      old_table_name: str,
                      new_table_name: str) -> None:
 
-        migrator = SqliteMigrator(cls.database())
-        migrate(migrator.rename_table(old_table_name, new_table_name))
+        cls.mutate([('rename_table', old_table_name, new_table_name)])
 
     @classmethod
     def rename_field(cls,
                      old_field_name: str,
                      new_field_name: str) -> None:
 
-        migrator = SqliteMigrator(cls.database())
-        migrate(migrator.rename_column(cls._meta.name, old_field_name, new_field_name))
-        cls._meta.add_field(new_field_name, getattr(cls, old_field_name))
-        cls._meta.remove_field(old_field_name)
+        cls.mutate([('rename', old_field_name, new_field_name)])
 
     @classmethod
     def remove_field(cls,
                      field_name: str) -> None:
 
-        migrator = SqliteMigrator(cls.database())
-        migrate(migrator.drop_column(cls._meta.name, field_name))
-        cls._meta.remove_field(field_name)
+        cls.mutate([('drop', field_name)])
 
     @classmethod
     def description(cls,
@@ -106,16 +292,23 @@ class AdaptiveTable(Model):
 
         indent = '  ' if indent else ''
         name = cls.get_name() if name is None else name
-        desc = f'{indent}* {cls.role}Table "{name}"\n'
+
+        # The description is cached per Table class until the schema changes
+        if '_description_cache' not in cls.__dict__:
+            cls._description_cache = {}
+        if (indent, name) in cls._description_cache:
+            return cls._description_cache[(indent, name)]
+
+        desc = [f'{indent}* {cls.role}Table "{name}"\n']
         for field in cls._meta.sorted_fields:
-            if type(field) == ForeignKeyField:
+            if isinstance(field, ForeignKeyField):
                 field_type = f'(FK -> {field.rel_model._meta.name})'
             else:
                 field_type = f'({field.field_type})'
-
-            desc += f'{indent}  - {field.name} {field_type}'
-            desc += f' (default)\n' if field.name in ['id', '_dt_'] else '\n'
-        return desc
+            default = ' (default)' if field.name in ['id', '_dt_'] else ''
+            desc.append(f'{indent}  - {field.name} {field_type}{default}\n')
+        cls._description_cache[(indent, name)] = ''.join(desc)
+        return cls._description_cache[(indent, name)]
 
     @classmethod
     def add_data(cls,
@@ -136,19 +329,18 @@ class StoringTable(AdaptiveTable):
                  batched: bool = False) -> Union[int, List[int]]:
 
         if not batched:
-            line = cls(**dict(zip(fields_names, fields_values)))
-            line.save()
+            # Without signal handlers to call, the line is inserted with a cached query, without a model instance
+            if not cls.has_receivers():
+                return cls.insert_line(fields_names, fields_values)
+            # Values are set in the line data directly rather than through the Fields accessors
+            line = cls()
+            line.__data__.update(zip(fields_names, fields_values))
+            line._dirty.update(fields_names)
+            line.save(force_insert=True)
             return line.id
 
         else:
-            fields = [getattr(cls, field) for field in fields_names]
-            batch = [tuple(samples) for samples in zip(*fields_values)]
-            n = cls.select().count()
-            with cls.database().atomic():
-                for chunk in chunked(batch, 100):
-                    cls.insert_many(chunk, fields=fields).execute()
-            N = cls.select().count()
-            return [cls.get_by_id(i + 1).id for i in range(n, N)]
+            return cls.insert_batch(fields_names, fields_values)
 
 
 class ExchangeTable(AdaptiveTable):
@@ -161,20 +353,27 @@ class ExchangeTable(AdaptiveTable):
                  batched: bool = False) -> Union[int, List[int]]:
 
         if not batched:
-            cls.delete().execute()
-            line = cls(**dict(zip(fields_names, fields_values)))
-            line.save()
+            # The previous line is replaced in a single transaction
+            with cls.database().atomic():
+                cls.delete().execute()
+                # Without signal handlers to call, the line is inserted with a cached query, without a model instance
+                if not cls.has_receivers():
+                    return cls.insert_line(fields_names, fields_values)
+                # Values are set in the line data directly rather than through the Fields accessors
+                line = cls()
+                line.__data__.update(zip(fields_names, fields_values))
+                line._dirty.update(fields_names)
+                line.save(force_insert=True)
             return line.id
 
         else:
-            fields = [getattr(cls, field) for field in fields_names]
-            batch = [tuple(samples) for samples in zip(*fields_values)]
-            cls.delete().execute()
-            pre_save.send(cls, created=False)
-            n = cls.select().count()
+            # Signals are only sent if some receivers are connected for the lines of this Table
+            has_receivers = cls.has_receivers()
             with cls.database().atomic():
-                for chunk in chunked(batch, 100):
-                    cls.insert_many(chunk, fields=fields).execute()
-            N = cls.select().count()
-            post_save.send(cls, created=False)
-            return [cls.get_by_id(i + 1).id for i in range(n, N)]
+                cls.delete().execute()
+                if has_receivers:
+                    pre_save.send(cls, created=False)
+                lines_id = cls.insert_batch(fields_names, fields_values)
+            if has_receivers:
+                post_save.send(cls, created=False)
+            return lines_id
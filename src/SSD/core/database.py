@@ -1,12 +1,11 @@
 from typing import Union, List, Type, Dict, Tuple, Optional, Any, Callable
 from os import remove, mkdir
 from os.path import exists, join, sep, getsize
-from inspect import getmembers
-from peewee import ForeignKeyField
-from playhouse.migrate import SqliteDatabase
+from peewee import ForeignKeyField, SqliteDatabase, Field, fn, chunked
 from playhouse.signals import Signal, pre_save, post_save
 from datetime import datetime
-from numpy import unique
+from functools import lru_cache
+from itertools import chain
 
 from SSD.core.adaptive_table import AdaptiveTable, StoringTable, ExchangeTable
 from SSD.core.peewee_extension import generate_models
@@ -14,6 +13,21 @@ from SSD.core.exporter import Exporter
 
 FieldType = Union[Tuple[str, Type], Tuple[str, Type, Any], Tuple[str, str]]
 
+# SQLite settings applied on each connection
+PRAGMAS = {'busy_timeout': 5000,
+           'temp_store': 'memory',
+           'mmap_size': 1 << 28,
+           'cache_size': -1 << 16}
+
+# SQLite settings applied to new Database files only: the WAL journal with a NORMAL synchronization only syncs on
+# checkpoints, but the journal mode is persistent in the file and requires the -wal and -shm files to read it
+NEW_PRAGMAS = {'journal_mode': 'wal',
+               'synchronous': 'normal',
+               **PRAGMAS}
+
+# Default maximum number of parameters of a SQLite query
+MAX_VARIABLES = 999
+
 
 class Database:
 
@@ -36,9 +50,14 @@ class Database:
         self.__database: Optional[SqliteDatabase] = None
         self.__tables: Dict[str, type(AdaptiveTable)] = {}
         self.__fk: Dict[str, Dict[str, str]] = {}
+        self.__fk_inverse: Dict[str, Dict[str, str]] = {}
+        self.__selections: Dict[Tuple[str, Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]],
+                                Tuple[Field, ...]] = {}
+        self.__architecture: Optional[Tuple[str, Dict[str, List[str]]]] = None
         self.__signals: List[Tuple[str, Signal, str, Callable, str]] = []
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def make_name(table_name: str) -> str:
         """
         Harmonize the Table names.
@@ -63,7 +82,9 @@ class Database:
         if exists(database_path := join(self.__database_dir, f'{self.__database_name}.db')):
             # Option 1: Overwriting file
             if remove_existing:
-                remove(database_path)
+                for file in [database_path, f'{database_path}-wal', f'{database_path}-shm']:
+                    if exists(file):
+                        remove(file)
             # Option 2: Indexing file name
             else:
                 index = 1
@@ -72,7 +93,7 @@ class Database:
                 self.__database_name = f'{self.__database_name}({index})'
 
         # Create the Database
-        self.__database = SqliteDatabase(database_path)
+        self.__database = SqliteDatabase(database_path, pragmas=NEW_PRAGMAS)
         return self
 
     def load(self, show_architecture: bool = False) -> 'Database':
@@ -87,7 +108,7 @@ class Database:
             raise ValueError(f"WARNING: the following Database does not exist ({database_path}).")
 
         # Load the Database
-        self.__database = SqliteDatabase(database_path)
+        self.__database = SqliteDatabase(database_path, pragmas=PRAGMAS)
         models, database_descr = generate_models(self.__database)
         for table_name, model in models.items():
             # Loading removes the '_' symbol in desc.model_names
@@ -103,11 +124,14 @@ class Database:
             self.__tables[table_name]._meta.name = table_name
 
         # Register FK
+        self.__clear_cache()
         for table_name in self.__tables:
             self.__fk[table_name] = {}
+            self.__fk_inverse[table_name] = {}
             for field_name, field in self.__tables[table_name].fields(only_names=False).items():
-                if type(field) == ForeignKeyField:
+                if isinstance(field, ForeignKeyField):
                     self.__fk[table_name][field_name] = field.rel_model._meta.name
+                    self.__fk_inverse[table_name].setdefault(field.rel_model._meta.name, field_name)
 
         # Show resulting architecture
         if show_architecture:
@@ -128,19 +152,33 @@ class Database:
         """
 
         print(f'\nDATABASE {self.__database_name}.db')
-        print(''.join([table.description(indent=True, name=name) for name, table in self.__tables.items()]))
+        print(self.__describe()[0])
 
     def get_architecture(self):
         """
         Get the content of the Database with Table(s) and their Field(s).
         """
 
-        architecture = {}
-        for table_name in self.__tables.keys():
-            description = self.__tables[table_name].description()
-            fields = description.split('  - ')
-            architecture[table_name] = [field[:-1] for field in fields[1:]]
-        return architecture
+        return {table_name: list(fields) for table_name, fields in self.__describe()[1].items()}
+
+    def __describe(self) -> Tuple[str, Dict[str, List[str]]]:
+
+        # The architecture is computed once until it changes
+        if self.__architecture is None:
+            architecture = {}
+            for table_name in self.__tables.keys():
+                description = self.__tables[table_name].description()
+                fields = description.split('  - ')
+                architecture[table_name] = [field[:-1] for field in fields[1:]]
+            self.__architecture = (''.join([table.description(indent=True, name=name)
+                                            for name, table in self.__tables.items()]), architecture)
+        return self.__architecture
+
+    def __clear_cache(self) -> None:
+
+        # Clear the selections and the architecture computed for the previous Tables and Fields
+        self.__selections.clear()
+        self.__architecture = None
 
     def get_tables(self,
                    only_names: bool = True):
@@ -168,7 +206,8 @@ class Database:
         table_name = self.make_name(table_name)
         if table_name not in self.__tables:
             raise ValueError(f"Unknown table with name {table_name}")
-        return self.__tables[table_name].fields(only_names=only_names)
+        fields = self.__tables[table_name].fields(only_names=only_names)
+        return list(fields) if only_names else fields
 
     def create_table(self,
                      table_name: str,
@@ -215,7 +254,7 @@ class Database:
                              storing_table=storing_table)
 
         # Extend the fields
-        fields = [fields] if type(fields) != list and fields is not None else fields
+        fields = [fields] if not isinstance(fields, list) and fields is not None else fields
         self.__new_fields(table_name=table_name,
                           fields=fields)
 
@@ -230,6 +269,8 @@ class Database:
             self.__tables[table_name] = type(table_name, (table_class,), dict(table_class.__dict__))
             self.__tables[table_name]._meta.name = table_name
             self.__fk[table_name] = {}
+            self.__fk_inverse[table_name] = {}
+            self.__clear_cache()
 
             # Connect the Table the Database
             self.__tables[table_name].connect(self.__database)
@@ -246,7 +287,9 @@ class Database:
         if fields is not None:
             table = self.__tables[table_name]
 
-            # Add each Field to the Table
+            # Check each Field then extend the Table with all of them at once
+            operations, new_fields, fk = [], [], {}
+            members = set(dir(table))
             for field in fields:
 
                 # Define name, type and default value
@@ -254,24 +297,32 @@ class Database:
                 field_default = '_null_' if len(field) == 2 else field[2]
 
                 # Extend the Table
-                if field_name not in table.fields():
+                if field_name not in table.fields() and field_name not in new_fields:
+                    new_fields.append(field_name)
 
                     # As peewee.Model creates a new attribute named field_name, check that this attribute does not exist
-                    if field_name in [m[0] for m in getmembers(table)]:
+                    if field_name in members:
                         raise ValueError(f"Tried to create a field '{field_name}' in the Table '{table_name}'. "
                                          f"You are not allowed to create a field with this name, please rename it.")
 
                     # FK
-                    if type(field_type) == str:
+                    if isinstance(field_type, str):
                         if (fk_table_name := self.make_name(field_type)) not in self.__tables.keys():
                             raise ValueError(f"Cannot create the ForeignKey '{fk_table_name}' since this Table does not"
                                              f"exists. Created Tables so far: {self.__tables.keys()}")
-                        table.extend_fk(self.__tables[fk_table_name], field_name)
-                        self.__fk[table_name][field_name] = fk_table_name
+                        operations.append(('add_fk', self.__tables[fk_table_name], field_name))
+                        fk[field_name] = fk_table_name
 
                     # Standard field
                     else:
-                        table.extend(field_name, field_type, field_default)
+                        operations.append(('add', field_name, field_type, field_default))
+
+            if len(operations) > 0:
+                table.mutate(operations)
+                self.__clear_cache()
+                self.__fk[table_name].update(fk)
+                for field_name, fk_table_name in fk.items():
+                    self.__fk_inverse[table_name].setdefault(fk_table_name, field_name)
 
     def register_pre_save_signal(self,
                                  table_name: str,
@@ -286,7 +337,7 @@ class Database:
         """
 
         table_name = self.make_name(table_name)
-        self.__signals.append(('pre_save', pre_save, table_name, self.__on_save_signal(handler), name))
+        self.__signals.append(('pre_save', pre_save, table_name, handler, name))
 
     def register_post_save_signal(self,
                                   table_name: str,
@@ -301,14 +352,15 @@ class Database:
         """
 
         table_name = self.make_name(table_name)
-        self.__signals.append(('post_save', post_save, table_name, self.__on_save_signal(handler), name))
+        self.__signals.append(('post_save', post_save, table_name, handler, name))
 
     @staticmethod
-    def __on_save_signal(handler: Callable):
+    def __on_save_signal(handler: Callable,
+                         table_name: str):
 
+        # The Table name is bound once when connecting the signal instead of being requested to the sender
         def signal_handler(sender, instance, **kwargs):
             # Convert received information into Table name and data
-            table_name = sender.get_name()
             handler(table_name, instance.__data__)
 
         return signal_handler
@@ -328,11 +380,20 @@ class Database:
                 print(f"WARNING: Signal '{signal_type}' was not connected with Table '{table_name}' as sender since "
                       f"it was not created.")
             else:
-                signal_class.connect(receiver=handler,
-                                     sender=self.__tables[table_name],
+                table = self.__tables[table_name]
+                signal_class.connect(receiver=self.__on_save_signal(handler, table.get_name()),
+                                     sender=table,
                                      name=name)
         self.__signals = []
 
+    def atomic(self):
+        """
+        Open a transaction on the Database, to be used as a context manager.
+        All the queries executed within the context are committed at once when leaving it.
+        """
+
+        return self.__database.atomic()
+
     def add_data(self,
                  table_name: str,
                  data: Dict[str, Any]):
@@ -360,10 +421,10 @@ class Database:
         table_name = self.make_name(table_name)
         # Check that the batch is well-formed
         if table_name in self.__fk:
-            batch_values = [batch[key] for key in set(batch.keys()) - set(self.__fk[table_name])]
-            if len(unique(samples := [len(b) for b in batch_values])) != 1:
+            samples = {key: len(value) for key, value in batch.items() if key not in self.__fk[table_name]}
+            if len(set(samples.values())) != 1:
                 raise ValueError(f"The number of samples per batch must be the same for all fields. Number of samples "
-                                 f"received per field: {dict(zip(batch.keys(), samples))}")
+                                 f"received per field: {samples}")
         return self.__add_data(table_name=table_name,
                                data=batch,
                                batched=True)
@@ -391,10 +452,10 @@ class Database:
         table = self.__tables[table_name]
 
         # Check fields existence
-        undefined_fields = set(fields_names) - set(table.fields())
+        undefined_fields = set(fields_names).difference(table.fields())
         if len(undefined_fields) > 0:
             # Empty table: add fields on the fly
-            if len(table.select()) == 0:
+            if not table.select().exists():
                 self.create_fields(table_name=table_name,
                                    fields=list(zip(fields_names, fields_types)))
             # Non-empty table
@@ -403,21 +464,30 @@ class Database:
                                  f" As table {table} is non-empty, please define first the following fields :"
                                  f" {list(undefined_fields)}.")
 
-        # Check FK data
-        fk_fields = set(fields_names).intersection(set(self.__fk[table_name].keys()))
-        for fk_field in fk_fields:
-            idx = fields_names.index(fk_field)
-            if type(fields_values[idx]) == dict:
-                fk_table_name = self.__fk[table_name][fk_field]
-                line = self.__add_data(table_name=fk_table_name,
-                                       data=fields_values[idx],
-                                       batched=batched)
-                fields_values[idx] = line
-
-        # Add the data to Table
-        return table.add_data(fields_names=fields_names,
-                              fields_values=fields_values,
-                              batched=batched)
+        # The lines of the Table and of its FK Tables are added in a single transaction
+        with self.__database.atomic():
+
+            # Check FK data
+            fk_fields = self.__fk[table_name].keys() & set(fields_names)
+            for fk_field in fk_fields:
+                idx = fields_names.index(fk_field)
+                # Batch of FK lines given line by line: gather them in a single batch to insert them at once, the
+                # fields missing in some lines being None
+                if batched and isinstance(fields_values[idx], list) and len(fields_values[idx]) > 0 and \
+                        all(isinstance(value, dict) for value in fields_values[idx]):
+                    names = dict.fromkeys(name for value in fields_values[idx] for name in value)
+                    fields_values[idx] = {name: [value.get(name) for value in fields_values[idx]] for name in names}
+                if isinstance(fields_values[idx], dict):
+                    fk_table_name = self.__fk[table_name][fk_field]
+                    line = self.__add_data(table_name=fk_table_name,
+                                           data=fields_values[idx],
+                                           batched=batched)
+                    fields_values[idx] = line
+
+            # Add the data to Table
+            return table.add_data(fields_names=fields_names,
+                                  fields_values=fields_values,
+                                  batched=batched)
 
     def update(self,
                table_name: str,
@@ -442,36 +512,41 @@ class Database:
         fields_values = list(data.values())
 
         # Define the line index
-        nb_line = self.nb_lines(table_name=table_name)
+        nb_line = self.__last_id(table)
         if line_id < 0:
             line_id += nb_line + 1
         elif line_id > nb_line:
             line_id = nb_line
 
         # Check fields existence
-        undefined_fields = set(fields_names) - set(table.fields())
+        undefined_fields = set(fields_names).difference(table.fields())
         if len(undefined_fields) > 0:
             raise ValueError(f"[{self.__class__.__name__}]  Some fields where not defined in table {table}."
                              f" As table {table} is non-empty, please define first the following fields :"
                              f" {list(undefined_fields)}.")
 
-        # Check FK data
-        fk_fields = set(fields_names).intersection(set(self.__fk[table_name].keys()))
-        for fk_field in fk_fields:
-            idx = fields_names.index(fk_field)
-            if type(fields_values[idx]) == dict:
-                fk_table_name = self.__fk[table_name][fk_field]
-                fk_id = self.get_line(table_name=table_name,
-                                      fields=fk_field,
-                                      line_id=line_id)[fk_field]
-                self.update(table_name=fk_table_name,
-                            data=fields_values[idx],
-                            line_id=fk_id)
-            del fields_names[idx]
-            del fields_values[idx]
+        # Check FK data: the FK lines ids are read with a single query
+        fk_data = {name: value for name, value in data.items()
+                   if name in self.__fk[table_name] and isinstance(value, dict)}
+        if len(fk_data) > 0:
+            fk_ids = self.get_line(table_name=table_name,
+                                   fields=list(fk_data.keys()),
+                                   line_id=line_id)
+            for fk_field, fk_values in fk_data.items():
+                self.update(table_name=self.__fk[table_name][fk_field],
+                            data=fk_values,
+                            line_id=fk_ids[fk_field])
+
+        # FK fields are not updated in the Table itself
+        fields = [(name, value) for name, value in zip(fields_names, fields_values)
+                  if name not in self.__fk[table_name]]
+        fields_names, fields_values = [name for name, _ in fields], [value for _, value in fields]
 
         # Update query
-        table.update(dict(zip(fields_names, fields_values))).where(table.id == line_id).execute()
+        if len(fields_names) > 0:
+            table.update_line(fields_names=fields_names,
+                              fields_values=fields_values,
+                              line_id=line_id)
 
     def get_line(self,
                  table_name: str,
@@ -494,37 +569,23 @@ class Database:
         table = self.__tables[table_name]
 
         # Define the fields to select
-        fields_selection = ()
-        if fields is not None:
-            fields_selection += (table.id,)
-            fields = [fields] if type(fields) == str else fields
-            for field in fields:
-                if field in table.fields():
-                    fields_selection += (table.fields(only_names=False)[field],)
-            if joins is not None:
-                joins = [joins] if type(joins) == str else joins
-                for j in joins:
-                    if j in self.__fk[table_name].values() and j not in fields:
-                        field_name = list(self.__fk[table_name].keys())[
-                            list(self.__fk[table_name].values()).index(j)]
-                        fields_selection += (table.fields(only_names=False)[field_name],)
+        fields, joins, fields_selection = self.__selection(table_name=table_name, fields=fields, joins=joins)
 
         # Define the index of the line to select
-        nb_line = self.nb_lines(table_name=table_name)
+        nb_line = self.__last_id(table)
         if line_id < 0:
             line_id += nb_line + 1
         elif line_id > nb_line:
             line_id = nb_line
 
         # Selection query
-        data = table.select(*fields_selection).where(table.id == line_id).dicts()[0]
+        data = table.select_line(fields=list(fields_selection), line_id=line_id)
 
         # Join
         if joins is not None:
-            joins = [joins] if type(joins) == str else joins
             for j in joins:
-                if j in self.__fk[table_name].values():
-                    field_name = list(self.__fk[table_name].keys())[list(self.__fk[table_name].values()).index(j)]
+                if j in self.__fk_inverse[table_name]:
+                    field_name = self.__fk_inverse[table_name][j]
                     if field_name in data:
                         data[field_name] = self.get_line(table_name=j,
                                                          fields=fields,
@@ -558,26 +619,13 @@ class Database:
         table = self.__tables[table_name]
 
         # Define the fields to select
-        fields_selection = ()
-        if fields is not None:
-            fields_selection += (table.id,)
-            fields = [fields] if type(fields) == str else fields
-            for field in fields:
-                if field in table.fields():
-                    fields_selection += (table.fields(only_names=False)[field],)
-            if joins is not None:
-                joins = [joins] if type(joins) == str else joins
-                for j in joins:
-                    if j in self.__fk[table_name].values() and j not in fields:
-                        field_name = list(self.__fk[table_name].keys())[
-                            list(self.__fk[table_name].values()).index(j)]
-                        fields_selection += (table.fields(only_names=False)[field_name],)
+        fields, joins, fields_selection = self.__selection(table_name=table_name, fields=fields, joins=joins)
 
         # Define the indices of lines to select
         if lines_id is None:
             if lines_range is not None and len(lines_range) != 2:
                 raise ValueError("The range of lines must contains the first and the last line indices.")
-            nb_line = self.nb_lines(table_name=table_name)
+            nb_line = self.__last_id(table)
             first_line_id = lines_range[0] if lines_range is not None else 1
             last_line_id = lines_range[1] if lines_range is not None else nb_line
             _slice = [first_line_id, last_line_id]
@@ -589,41 +637,98 @@ class Database:
             _slice[1] = _slice[0] + 1 if _slice[1] < _slice[0] else _slice[1] + 1
             lines_id = range(*_slice)
 
-        # Selection query
-        query = table.select(*fields_selection).where(table.id << lines_id).dicts()
+        # Selection query: a range of indices is selected with its bounds, a list of indices is selected by chunks so
+        # that the number of query parameters remains below the SQLite limit
+        query = table.select(*fields_selection)
+        if isinstance(lines_id, range) and lines_id.step == 1:
+            queries = [query.where(table.id.between(lines_id.start, lines_id.stop - 1))]
+        else:
+            lines_id = sorted(set(lines_id)) if len(lines_id) > MAX_VARIABLES else lines_id
+            queries = [query.where(table.id << chunk) for chunk in chunked(lines_id, MAX_VARIABLES)]
 
         # Return the lines as batch or as list of lines
         lines: Union[Dict[str, List[Any]], List[Dict[str, Any]]]
         if batched:
-            lines = dict(zip(query[0].keys(),
-                             [[query[i][key] for i in range(len(query))] for key in query[0].keys()]))
+            # Rows are fetched once as tuples then transposed into one batch per field
+            keys = [column.name for column in query.selected_columns]
+            batches = zip(*chain.from_iterable(q.tuples().iterator() for q in queries))
+            lines = {key: list(batch) for key, batch in zip(keys, batches)} or {key: [] for key in keys}
         else:
-            lines = [line for line in query]
+            lines = list(chain.from_iterable(q.dicts().iterator() for q in queries))
 
         # Join
         if joins is not None:
-            joins = [joins] if type(joins) == str else joins
             for j in joins:
-                if j in self.__fk[table_name].values():
-                    field_name = list(self.__fk[table_name].keys())[
-                        list(self.__fk[table_name].values()).index(j)]
-                    dict_keys = lines.keys() if batched else lines[0].keys()
+                if j in self.__fk_inverse[table_name]:
+                    field_name = self.__fk_inverse[table_name][j]
+                    dict_keys = lines.keys() if batched else lines[0].keys() if len(lines) > 0 else []
                     if field_name in dict_keys:
                         lines_id = lines[field_name] if batched else [line[field_name] for line in lines]
+
+                        # The joined lines are selected once per distinct index, then dispatched by index
+                        unique_id = sorted(set(lines_id) - {None})
+                        if len(unique_id) == 0:
+                            continue
                         data = self.get_lines(table_name=j,
                                               fields=fields,
-                                              lines_id=lines_id,
+                                              lines_id=unique_id,
                                               joins=joins,
                                               batched=batched)
 
                         if batched:
-                            lines[field_name] = data
+                            position = dict(zip(data['id'], range(len(data['id']))))
+                            lines[field_name] = self.__reorder(data, [position.get(i) for i in lines_id])
                         else:
-                            for i, l in enumerate(data):
-                                lines[i][field_name] = l
+                            data = dict(zip([line['id'] for line in data], data))
+                            for line, i in zip(lines, lines_id):
+                                line[field_name] = data.get(i)
 
         return lines
 
+    def __selection(self,
+                    table_name: str,
+                    fields: Optional[Union[str, List[str]]],
+                    joins: Optional[Union[str, List[str]]]) -> Tuple[Optional[List[str]],
+                                                                     Optional[List[str]],
+                                                                     Tuple[Field, ...]]:
+
+        fields = [fields] if isinstance(fields, str) else fields
+        joins = [joins] if isinstance(joins, str) else joins
+
+        # The selected Fields are cached per Table, fields and joins until the architecture changes
+        key = (table_name, None if fields is None else tuple(fields), None if joins is None else tuple(joins))
+        if key not in self.__selections:
+            table = self.__tables[table_name]
+            fields_selection = ()
+            if fields is not None:
+                fields_selection += (table.id,)
+                for field in fields:
+                    if field in table.fields():
+                        fields_selection += (table.fields(only_names=False)[field],)
+                if joins is not None:
+                    for j in joins:
+                        if j in self.__fk_inverse[table_name] and j not in fields:
+                            field_name = self.__fk_inverse[table_name][j]
+                            fields_selection += (table.fields(only_names=False)[field_name],)
+            self.__selections[key] = fields_selection
+        return fields, joins, self.__selections[key]
+
+    @staticmethod
+    def __reorder(batch: Dict[str, Any],
+                  positions: List[Optional[int]]) -> Dict[str, Any]:
+
+        # Reorder the lines of a batch (and of its joined batches), missing lines being None
+        return {key: Database.__reorder(values, positions) if isinstance(values, dict) else
+                [None if i is None else values[i] for i in positions] for key, values in batch.items()}
+
+    @staticmethod
+    def __last_id(table: Type[AdaptiveTable]) -> int:
+
+        # No method of the Database removes single lines and the lines of an ExchangeTable restart at 1 after it is
+        # emptied, so the last index is found with the primary key instead of counting lines (lines removed from the
+        # file by other means would make both differ, which is why nb_lines still counts them)
+        return table.select(fn.MAX(table.id)).scalar() or 0
+
     def nb_lines(self,
                  table_name: str):
         """
@@ -646,7 +751,9 @@ class Database:
         Return the Database file memory size in bytes.
         """
 
-        return getsize(join(self.__database_dir, f'{self.__database_name}.db'))
+        # Pages that are not checkpointed yet are still stored in the WAL file
+        database_path = join(self.__database_dir, f'{self.__database_name}.db')
+        return sum([getsize(file) for file in [database_path, f'{database_path}-wal'] if exists(file)])
 
     def close(self, erase_file: bool = False):
         """
@@ -656,8 +763,11 @@ class Database:
         """
 
         self.__database.close()
-        if erase_file and exists(database_path := join(self.__database_dir, f'{self.__database_name}.db')):
-            remove(database_path)
+        if erase_file:
+            database_path = join(self.__database_dir, f'{self.__database_name}.db')
+            for file in [database_path, f'{database_path}-wal', f'{database_path}-shm']:
+                if exists(file):
+                    remove(file)
 
     def rename_table(self,
                      table_name: str,
@@ -677,6 +787,7 @@ class Database:
         # Renaming
         self.__tables[new_table_name] = self.__tables.pop(table_name)
         self.__tables[new_table_name].rename_table(table_name, new_table_name)
+        self.__clear_cache()
 
     def rename_field(self,
                      table_name: str,
@@ -701,6 +812,7 @@ class Database:
 
         # Renaming
         self.__tables[table_name].rename_field(field_name, new_field_name)
+        self.__clear_cache()
 
     def remove_table(self,
                      table_name: str):
@@ -718,6 +830,7 @@ class Database:
         # Remove the Table
         self.__database.drop_tables(self.__tables[table_name])
         del self.__tables[table_name]
+        self.__clear_cache()
 
     def remove_field(self,
                      table_name: str,
@@ -740,6 +853,7 @@ class Database:
 
         # Renaming
         self.__tables[table_name].remove_field(field_name)
+        self.__clear_cache()
 
     def export(self,
                exporter: str,
@@ -766,9 +880,9 @@ class Database:
 
         # Get the tables to export
         tables = self.get_tables() if tables is None else tables
-        tables = [tables] if type(tables) != list else tables
+        tables = [tables] if not isinstance(tables, list) else tables
         for table in tables:
-            if table not in self.get_tables():
+            if table not in self.__tables:
                 raise ValueError(f"The following Table does not exist: {table}")
 
         # Export each table
@@ -776,8 +890,8 @@ class Database:
         for table in tables:
             _filename = filename + f'_{table}.{exporter}'
             if exporter == 'json':
-                query = self.get_lines(table_name=table, batched=True)
+                query = self.__tables[table].select().order_by(self.__tables[table].id)
                 Exporter.export_json(filename=_filename, query=query)
             else:
-                query = self.__tables[table].select().tuples()
+                query = self.__tables[table].select().order_by(self.__tables[table].id).tuples()
                 Exporter.export_csv(filename=_filename, query=query)
@@ -1,10 +1,15 @@
 from typing import Union, Dict, Any
 import json
 import csv
-from peewee import Query
+from peewee import Query, chunked
 from datetime import datetime
 from numpy import ndarray
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def default_format(o: Any):
     if isinstance(o, datetime):
@@ -13,6 +18,13 @@ def default_format(o: Any):
         return o.tolist()
 
 
+def dumps(o: Any) -> bytes:
+    # orjson is optional but serializes numpy arrays natively
+    if orjson is not None:
+        return orjson.dumps(o, default=default_format, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(o, default=default_format, ensure_ascii=False, separators=(',', ':')).encode()
+
+
 class Exporter:
 
     @classmethod
@@ -20,20 +32,32 @@ class Exporter:
                     filename: str,
                     query: Union[Dict[str, Any], Query]):
 
-        file = open(filename, 'w')
-        json.dump(query, file, default=default_format)
-        file.close()
+        with open(filename, 'wb', buffering=1 << 20) as file:
+            if not isinstance(query, Query):
+                file.write(dumps(query))
+                return
+
+            # Write the Table column by column, values being fetched and encoded per chunk; columns are read in a
+            # single transaction so that they all come from the same snapshot of the Table
+            file.write(b'{')
+            with query.model._meta.database.atomic():
+                for i, column in enumerate(query.selected_columns):
+                    file.write((b',' if i > 0 else b'') + dumps(column.name) + b':[')
+                    for j, chunk in enumerate(chunked(query.select(column).tuples().iterator(), 1000)):
+                        file.write((b',' if j > 0 else b'') + dumps([row[0] for row in chunk])[1:-1])
+                    file.write(b']')
+            file.write(b'}')
 
     @classmethod
     def export_csv(cls,
                    filename: str,
                    query: Union[Dict[str, Any], Query]):
 
-        with open(filename, 'w') as file:
+        with open(filename, 'w', newline='', buffering=1 << 20) as file:
             writer = csv.writer(file)
             t = query.execute()
             t.initialize()
             if getattr(t, 'columns', None):
-                writer.writerow([column for column in t.columns])
-            for row in t:
-                writer.writerow(row)
+                writer.writerow(t.columns)
+            # Rows are written while fetched, without being cached by the query
+            writer.writerows(t.iterator())
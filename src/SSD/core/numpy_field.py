@@ -1,13 +1,60 @@
 from peewee import Field
-from numpy import ndarray
+from numpy import ndarray, frombuffer, dtype
 from pickle import loads
+from struct import pack, unpack_from
+import zlib
+
+try:
+    import blosc
+except ImportError:
+    blosc = None
+
+# Compressed arrays are prefixed with a header that cannot be confused with the start of a pickle stream
+COMPRESSED = b'\x00NPY'
+BLOSC, ZLIB = b'b', b'z'
 
 
 class NumpyField(Field):
     field_type = 'NUMPY'
 
     def db_value(self, value: ndarray):
-        return value if value is None else value.dumps()
+        if value is None:
+            return value
+        # Compression is opt-in with the 'compress_arrays' attribute of the Table ('zlib' or True, 'blosc'), arrays
+        # whose dtype cannot be described by its type string (objects, structured dtypes) are always pickled
+        compress_arrays = getattr(self.model, 'compress_arrays', False)
+        if not compress_arrays or value.dtype.hasobject or value.dtype.names is not None:
+            return value.dumps()
+        if compress_arrays not in (True, 'zlib', 'blosc'):
+            raise ValueError(f"Unknown arrays compression '{compress_arrays}', available ones are 'zlib' and 'blosc'.")
+        if compress_arrays == 'blosc' and blosc is None:
+            raise ImportError("The 'blosc' package is required to compress arrays with 'blosc'.")
+
+        # Header: codec, dtype and shape of the array, followed by the compressed raw data
+        dtype_str = value.dtype.str.encode()
+        codec = BLOSC if compress_arrays == 'blosc' else ZLIB
+        header = COMPRESSED + codec + pack(f'<B{len(dtype_str)}sB{value.ndim}Q', len(dtype_str), dtype_str,
+                                           value.ndim, *value.shape)
+        if codec == BLOSC:
+            return header + blosc.compress(value.tobytes(), typesize=value.dtype.itemsize, clevel=3,
+                                           shuffle=blosc.SHUFFLE, cname='lz4')
+        return header + zlib.compress(value.tobytes(), 1)
 
     def python_value(self, value: bytes):
-        return value if value is None else loads(value)
+        if value is None or not value.startswith(COMPRESSED):
+            return value if value is None else loads(value)
+
+        # Read the header then decompress the raw data
+        codec, offset = value[4:5], 5
+        dtype_len, = unpack_from('<B', value, offset)
+        dtype_str, ndim = unpack_from(f'<{dtype_len}sB', value, offset + 1)
+        offset += 2 + dtype_len
+        shape = unpack_from(f'<{ndim}Q', value, offset)
+        offset += 8 * ndim
+        if codec == BLOSC:
+            if blosc is None:
+                raise ImportError("The 'blosc' package is required to read the compressed arrays of this Database.")
+            data = blosc.decompress(value[offset:])
+        else:
+            data = zlib.decompress(value[offset:])
+        return frombuffer(data, dtype=dtype(dtype_str.decode())).reshape(shape).copy()
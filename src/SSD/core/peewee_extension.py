@@ -8,9 +8,10 @@ from SSD.core.numpy_field import NumpyField
 
 def generate_models(database, schema=None, **options):
 
-    # EXTENSION: Use extended inspector
+    # EXTENSION: Use extended inspector, the schema being read within a single transaction
     introspector = ExtendedIntrospector.from_database(database, schema=schema)
-    return introspector.generate_models(**options)
+    with database.atomic():
+        return introspector.generate_models(**options)
 
 
 class ExtendedSqliteMetadata(SqliteMetadata):
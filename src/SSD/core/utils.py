@@ -45,13 +45,25 @@ def merge(database_files: List[str],
     # Adding data
     print("Proceeding...")
     for db in databases:
-        for table_name in db.get_tables():
-            for line_id in range(1, db.nb_lines(table_name=table_name) + 1):
-                data = db.get_line(table_name=table_name, line_id=line_id)
-                if 'id' in data:
-                    del data['id']
-                merged_database.add_data(table_name=table_name,
-                                         data=data)
+        # Lines are copied by batches, all the lines of a Database being added in a single transaction
+        with merged_database.atomic():
+            for table_name in db.get_tables():
+                nb_lines = db.nb_lines(table_name=table_name)
+                for first_line_id in range(1, nb_lines + 1, 1000):
+                    last_line_id = min(first_line_id + 999, nb_lines)
+                    batch = db.get_lines(table_name=table_name,
+                                         lines_range=[first_line_id, last_line_id],
+                                         batched=True)
+                    if 'id' in batch:
+                        del batch['id']
+                    # Tables without any other Field than 'id' only receive empty lines
+                    if len(batch) == 0:
+                        for _ in range(last_line_id - first_line_id + 1):
+                            merged_database.add_data(table_name=table_name,
+                                                     data={})
+                    else:
+                        merged_database.add_batch(table_name=table_name,
+                                                  batch=batch)
         db.close()
     merged_database.close()
     print("Merge complete.")
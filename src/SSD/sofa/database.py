@@ -112,17 +112,20 @@ class Database(Sofa.Core.Controller, CoreDatabase):
         At the end of a time step.
         """
 
-        # Execute all callbacks
-        for table_name in self.__callbacks:
-            data = {}
-            for field_name, (record_object, record_field) in self.__callbacks[table_name].items():
-                data[field_name] = record_object.getData(record_field).value
-            self.add_data(table_name=table_name, data=data)
-
-        # If a Table was not updated, add an empty line (keep one line per time step)
-        for table_name, dirty in self.__dirty.items():
-            if not dirty:
-                self.add_data(table_name, data={})
+        # Write all the lines of the time step in a single transaction
+        with self.atomic():
+
+            # Execute all callbacks
+            for table_name in self.__callbacks:
+                data = {}
+                for field_name, (record_object, record_field) in self.__callbacks[table_name].items():
+                    data[field_name] = record_object.getData(record_field).value
+                self.add_data(table_name=table_name, data=data)
+
+            # If a Table was not updated, add an empty line (keep one line per time step)
+            for table_name, dirty in self.__dirty.items():
+                if not dirty:
+                    self.add_data(table_name, data={})
 
     def add_data(self,
                  table_name: str,